@@ -5,7 +5,13 @@ local bigint = {};
 --##### FORWARD DECLARATIONS #####--
 
 local bigint_mt;
+local bigint_mutable;
+local bigint_pool;
+local bigint_poolLimit;
+local bigint_acquire;
+local bigint_release;
 local bigint_digits;
+local bigint_unpackLimit;
 local bigint_comparatorMap;
 local bigint_rstrip;
 local bigint_ensureBigInt;
@@ -13,6 +19,38 @@ local bigint_ensureInt;
 local bigint_ensureString;
 local bigint_ensureBool;
 local bigint_ensureArray;
+local bigint_ensureFunction;
+local bigint_groupSize;
+local bigint_mulAddSmall;
+local bigint_divModSmall;
+local bigint_smallLimit;
+local bigint_parseLimit;
+local bigint_parseChunkBytes;
+local bigint_cacheLookup;
+local bigint_cacheEntries;
+local bigint_cacheList;
+local bigint_cacheCount;
+local bigint_cacheCapacity;
+local bigint_cacheMaxLength;
+local bigint_cacheHits;
+local bigint_cacheMisses;
+local bigint_divLoop;
+local bigint_copyInto;
+local bigint_addInPlace;
+local bigint_mulInto;
+local bigint_modInPlace;
+local bigint_compileOps;
+local bigint_parseExpression;
+local bigint_divWithRemainder;
+local bigint_pow;
+local bigint_toBase;
+local bigint_writeBase;
+local bigint_newTicker;
+local bigint_bitwiseS;
+local bigint_sqrInto;
+local bigint_sqrTicks;
+local bigint_addBytesAt;
+local bigint_sqrThreshold;
 local table_reverse;
 local table_copy;
 
@@ -20,37 +58,46 @@ local table_copy;
 
 local math_floor = math.floor;
 local math_ceil = math.ceil;
+local math_min = math.min;
+local math_max = math.max;
+local math_log = math.log;
+local math_huge = math.huge;
+local coroutine_running = coroutine.running;
+local coroutine_yield = coroutine.yield;
 local table_concat = table.concat;
 local string_sub = string.sub;
 local string_byte = string.byte;
 local string_char = string.char;
 local string_format = string.format;
+local string_gsub = string.gsub;
+local string_find = string.find;
+local string_upper = string.upper;
 local string_dump = string.dump;
 local unpack = unpack or table.unpack;
 local getmetatable = getmetatable;
 local setmetatable = setmetatable;
 local tonumber = tonumber;
 local type = type;
+local rawequal = rawequal;
+local tostring = tostring;
 local loadstring = loadstring or load;
 
 --##### CONSTRUCTORS #####--
 
+-- bytes are stored little-endian in the array part, and the sign in the only hash field
 function bigint.New()
     local self = {
-        sign = 0,
-        bytes = {},
-        mutable = false
+        sign = 0
     };
     self = setmetatable(self, bigint_mt);
     return self;
 end
 
+-- strings and numbers are looked up in the literal cache, so the result may be shared
 function bigint.Construct(value, base)
     local valueType = type(value);
-    if valueType == "string" then
-        return bigint.FromString(value, base);
-    elseif valueType == "number" then
-        return bigint.FromNumber(value);
+    if valueType == "string" or valueType == "number" then
+        return bigint_cacheLookup(value, base);
     elseif valueType == "table" then
         if bigint.IsBigInt(value) then
             return value;
@@ -95,20 +142,26 @@ function bigint.FromString(value, base)
 
     base = bigint_ensureInt(base, 2, 36, 10);
     if base == 2 or base == 16 then
-        -- fast bin/hex parser
-        local width = 8;
+        -- fast bin/hex parser, reading several bytes with each tonumber
+        local width = 8 * bigint_parseChunkBytes;
         if base == 16 then
-            width = 2;
+            width = 2 * bigint_parseChunkBytes;
         end
         local i = 1;
         for j = digitsEnd, digitsStart, -width do
+            local chunk;
             if j - width + 1 <= digitsStart then
-                self.bytes[i] = tonumber(string_sub(value, digitsStart, j), base);
+                chunk = tonumber(string_sub(value, digitsStart, j), base);
             else
-                self.bytes[i] = tonumber(string_sub(value, j - width + 1, j), base);
+                chunk = tonumber(string_sub(value, j - width + 1, j), base);
+            end
+            for _ = 1, bigint_parseChunkBytes, 1 do
+                self[i] = chunk % 256;
+                chunk = math_floor(chunk / 256);
+                i = i + 1;
             end
-            i = i + 1;
         end
+        bigint_rstrip(self);
         return self;
     else
         -- general parser
@@ -117,9 +170,9 @@ function bigint.FromString(value, base)
             -- multiply by base
             local carry = 0;
             local j = 1;
-            while self.bytes[j] ~= nil or carry ~= 0 do
-                local product = (self.bytes[j] or 0) * base + carry;
-                self.bytes[j] = product % 256;
+            while self[j] ~= nil or carry ~= 0 do
+                local product = (self[j] or 0) * base + carry;
+                self[j] = product % 256;
                 carry = math_floor(product / 256);
                 j = j + 1;
             end
@@ -128,8 +181,8 @@ function bigint.FromString(value, base)
             j = 1;
             carry = tonumber(string_sub(value, i, i), base);
             while carry ~= 0 do
-                local sum = (self.bytes[j] or 0) + carry;
-                self.bytes[j] = sum % 256;
+                local sum = (self[j] or 0) + carry;
+                self[j] = sum % 256;
                 carry = math_floor(sum / 256);
                 j = j + 1;
             end
@@ -151,7 +204,7 @@ function bigint.FromNumber(value)
 
     local i = 1;
     while value > 0 do
-        self.bytes[i] = value % 256;
+        self[i] = value % 256;
         i = i + 1;
         value = math_floor(value / 256);
     end
@@ -163,9 +216,9 @@ function bigint.FromArray(array, littleEndian)
     littleEndian = bigint_ensureBool(littleEndian, false);
 
     local self = bigint.New();
-    self.bytes = table_copy(array);
+    table_copy(self, array);
     if not littleEndian then
-        table_reverse(self.bytes);
+        table_reverse(self);
     end
     self.sign = 1;
     bigint_rstrip(self);
@@ -177,15 +230,128 @@ function bigint.FromBytes(bytes, littleEndian)
     littleEndian = bigint_ensureBool(littleEndian, false);
 
     local self = bigint.New();
-    self.bytes = {string_byte(bytes, 1, #bytes)};
+    for i = 1, #bytes, 1 do
+        self[i] = string_byte(bytes, i);
+    end
     if not littleEndian then
-        table_reverse(self.bytes);
+        table_reverse(self);
     end
     self.sign = 1;
     bigint_rstrip(self);
     return self;
 end
 
+-- parse integer from a reader function returning successive chunks of a string
+-- (e.g. io.lines(file, 65536)); whitespace between chunks is ignored
+function bigint.FromReader(reader, base)
+    reader = bigint_ensureFunction(reader);
+
+    local function read()
+        local chunk = reader();
+        if chunk ~= nil then
+            chunk = string_gsub(bigint_ensureString(chunk), "%s+", "");
+        end
+        return chunk;
+    end
+
+    -- read enough characters to parse the sign and prefix
+    local chunk = "";
+    repeat
+        local nextChunk = read();
+        if nextChunk == nil then
+            break;
+        end
+        chunk = chunk .. nextChunk;
+    until #chunk >= 3;
+
+    local self = bigint.New();
+    local bytes = self;
+    local sign = 1;
+    local digitsStart = 1;
+    if string_byte(chunk, digitsStart) == 0x2d then -- "-"
+        sign = -1;
+        digitsStart = digitsStart + 1;
+    end
+    if string_byte(chunk, digitsStart) == 0x30 then -- "0"
+        local prefix = string_byte(chunk, digitsStart + 1);
+        if (base == nil or base == 16) and prefix == 0x78 then      -- "x"
+            base = 16;
+            digitsStart = digitsStart + 2;
+        elseif (base == nil or base == 2) and prefix == 0x62 then   -- "b"
+            base = 2;
+            digitsStart = digitsStart + 2;
+        end
+    end
+    chunk = string_sub(chunk, digitsStart);
+
+    base = bigint_ensureInt(base, 2, 36, 10);
+    local groupSize, factor;
+    local byteGroups = false;
+    if base == 16 then
+        -- fast hex parser: collect big-endian bytes and reverse at the end
+        groupSize = 2;
+        byteGroups = true;
+    elseif base == 2 then
+        groupSize = 8;
+        byteGroups = true;
+    else
+        groupSize, factor = bigint_groupSize(base, bigint_parseLimit);
+    end
+
+    -- tonumber also accepts signs, points, exponents and prefixes,
+    -- so reject anything other than the digits of base before it sees a group
+    local invalidDigits = "[^0-" .. bigint_digits[math_min(base, 10)] .. "]";
+    if base > 10 then
+        local lastDigit = bigint_digits[base];
+        invalidDigits = "[^0-9a-" .. lastDigit .. "A-" .. string_upper(lastDigit) .. "]";
+    end
+
+    local byteCount = 0;
+    local leftover = "";
+    while chunk ~= nil do
+        if string_find(chunk, invalidDigits) then
+            error("invalid digit");
+        end
+        chunk = leftover .. chunk;
+        local chunkSize = #chunk;
+        local groupsEnd = chunkSize - chunkSize % groupSize;
+        for i = 1, groupsEnd, groupSize do
+            local value = tonumber(string_sub(chunk, i, i + groupSize - 1), base);
+            if value == nil then
+                error("invalid digit");
+            end
+            if byteGroups then
+                byteCount = byteCount + 1;
+                bytes[byteCount] = value;
+            else
+                bigint_mulAddSmall(bytes, factor, value);
+            end
+        end
+        leftover = string_sub(chunk, groupsEnd + 1);
+        chunk = read();
+    end
+
+    if byteGroups then
+        table_reverse(bytes);
+    end
+    if leftover ~= "" then
+        local value = tonumber(leftover, base);
+        if value == nil then
+            error("invalid digit");
+        end
+        -- integer power so that bytes stay integers in Lua 5.3+
+        factor = 1;
+        for _ = 1, #leftover, 1 do
+            factor = factor * base;
+        end
+        bigint_mulAddSmall(bytes, factor, value);
+    end
+
+    self.sign = sign;
+    bigint_rstrip(self);
+    return self;
+end
+
 function bigint.IsBigInt(obj)
     return getmetatable(obj) == bigint_mt;
 end
@@ -242,7 +408,7 @@ function bigint:Add(other)
     local swapOrder = false;
     local changeSign = false;
     if self.sign == other.sign then
-        if #self.bytes < #other.bytes then
+        if #self < #other then
             swapOrder = true;
         end
     else
@@ -264,11 +430,11 @@ function bigint:Add(other)
     local bytes;
     local otherBytes;
     if swapOrder then
-        bytes = other.bytes;
-        otherBytes = self.bytes;
+        bytes = other;
+        otherBytes = self;
     else
-        bytes = self.bytes;
-        otherBytes = other.bytes;
+        bytes = self;
+        otherBytes = other;
     end
     byteCount = #bytes;
     otherByteCount = #otherBytes;
@@ -281,13 +447,13 @@ function bigint:Add(other)
         end
         local sum = byte + otherByte + carry;
         if not subtract and sum >= 256 then
-            this.bytes[i] = sum - 256;
+            this[i] = sum - 256;
             carry = 1;
         elseif subtract and sum < 0 then
-            this.bytes[i] = sum + 256;
+            this[i] = sum + 256;
             carry = -1;
         else
-            this.bytes[i] = sum;
+            this[i] = sum;
             carry = 0;
         end
 
@@ -296,14 +462,14 @@ function bigint:Add(other)
             if swapOrder then
                 -- just need to copy remaining bytes
                 for j = i + 1, byteCount, 1 do
-                    this.bytes[j] = bytes[j];
+                    this[j] = bytes[j];
                 end
             end
             break;
         end
     end
     if carry > 0 then
-        this.bytes[byteCount + 1] = carry
+        this[byteCount + 1] = carry
     end
     if subtract then
         bigint_rstrip(this);
@@ -316,7 +482,20 @@ end
 
 function bigint:Sub(other)
     other = bigint_ensureBigInt(other);
-    return self:Add(other:Unm());
+
+    if other.sign == 0 then
+        return self;
+    end
+
+    -- add the negation of other, kept in a temporary
+    local negOther = bigint_acquire();
+    bigint_copyInto(negOther, other);
+    negOther.sign = -other.sign;
+    local result = self:Add(negOther);
+    if not rawequal(result, negOther) then
+        bigint_release(negOther);
+    end
+    return result;
 end
 
 function bigint:Mul(other)
@@ -343,57 +522,39 @@ function bigint:Mul(other)
         end
     end
 
+    -- squaring
+    if rawequal(self, other) then
+        return self:Sqr();
+    end
+
     -- general multiplication
-    local carry = 0;
-    local this = self:CopyIfImmutable();
-    local bytes = this.bytes;
-    local otherBytes = other.bytes;
-    local byteCount = #bytes;
-    local otherByteCount = #otherBytes;
-    if otherByteCount > byteCount then
-        -- swap order so that number with more bytes comes first
-        bytes = other.bytes;
-        otherBytes = this.bytes;
-        local tmp = byteCount;
-        byteCount = otherByteCount;
-        otherByteCount = tmp;
-    end
-    local shift = 0;
-    local result = {};
-    local carry = 0;
-    for i = 1, otherByteCount, 1 do
-        if otherBytes[i] == 0 then
-            if result[i] == nil then
-                result[i] = 0;
-            end
-        else
-            -- multiply each byte
-            local j = 1;
-            while j <= byteCount do
-                local resultIdx = i + j - 1;
-                local product = bytes[j] * otherBytes[i] + carry + (result[resultIdx] or 0);
-                -- add product to result
-                result[resultIdx] = product % 256;
-                carry = math_floor(product / 256);
-                j = j + 1;
-            end
+    if bigint_mutable[self] then
+        local product = bigint_acquire();
+        bigint_mulInto(product, self, other);
+        bigint_copyInto(self, product);
+        bigint_release(product);
+        return self;
+    end
+    local this = bigint.New();
+    bigint_mulInto(this, self, other);
+    return this;
+end
 
-            -- finish adding carry
-            while carry ~= 0 do
-                local resultIdx = i + j - 1;
-                local sum = (result[resultIdx] or 0) + carry;
-                result[resultIdx] = sum % 256;
-                carry = math_floor(sum / 256);
-                j = j + 1;
-            end
-        end
+function bigint:Sqr()
+    if self.sign == 0 then
+        return self;
     end
-    table_copy(this.bytes, result);
-    this.sign = this.sign * other.sign;
+    local this = bigint.New();
+    bigint_sqrInto(this, self);
     return this;
 end
 
 function bigint:DivWithRemainder(other, ignoreRemainder)
+    return bigint_divWithRemainder(self, other, ignoreRemainder, false);
+end
+
+-- if async is true, yields progress while running in a coroutine
+function bigint_divWithRemainder(self, other, ignoreRemainder, async)
     other = bigint_ensureBigInt(other);
     ignoreRemainder = bigint_ensureBool(ignoreRemainder, false);
 
@@ -435,62 +596,17 @@ function bigint:DivWithRemainder(other, ignoreRemainder)
 
     -- general division
     local this = self:CopyIfImmutable();
-    local another = other:CopyIfImmutable();
-    local byteCount = #this.bytes;
-    local otherByteCount = #another.bytes;
-    local resultIdx = 1;
-    local result = {};
-    local divIdx = byteCount - otherByteCount + 1;
-    while divIdx >= 1 do
-        local factor = 0;
-        repeat
-            -- check if divisor is smaller
-            local foundFactor = false;
-            local sliceSize = otherByteCount;
-            if divIdx + sliceSize <= byteCount and this.bytes[divIdx + sliceSize] ~= 0 then
-                sliceSize = sliceSize + 1;
-            end
-            for i = sliceSize, 1, -1 do
-                local byte = this.bytes[divIdx + i - 1] or 0;
-                local otherByte = another.bytes[i] or 0;
-                if otherByte < byte then
-                    foundFactor = false;
-                    break;
-                elseif otherByte > byte then
-                    foundFactor = true;
-                    break;
-                end
-            end
-
-            -- subtract divisor
-            if not foundFactor then
-                factor = factor + 1;
-                local carry = 0;
-                local i = 1;
-                while i <= sliceSize or carry ~= 0 do
-                    local j = divIdx + i - 1;
-                    local diff = (this.bytes[j] or 0) - (another.bytes[i] or 0) + carry;
-                    if diff < 0 then
-                        carry = -1;
-                        diff = diff + 256;
-                    else
-                        carry = 0;
-                    end
-                    this.bytes[j] = diff;
-                    i = i + 1;
-                end
-            end
-        until foundFactor;
-
-        -- set digit
-        result[resultIdx] = factor;
-        resultIdx = resultIdx + 1;
-
-        divIdx = divIdx - 1;
+    local quotient = bigint.New();
+    local tick;
+    if async then
+        -- each quotient digit takes on average 128 subtractions
+        local otherByteCount = #other;
+        tick = bigint_newTicker((#this - otherByteCount + 1) * otherByteCount * 128);
     end
+    bigint_divLoop(this, other, quotient, tick);
 
     local sign = this.sign;
-    local otherSign = another.sign;
+    local otherSign = other.sign;
     local divSign = sign * otherSign;
 
     bigint_rstrip(this);
@@ -498,20 +614,18 @@ function bigint:DivWithRemainder(other, ignoreRemainder)
     -- if remainder is negative, add divisor to make it positive
     if not ignoreRemainder then
         if sign == -otherSign and this.sign ~= 0 then
-            this = this:Add(another);
+            bigint_addInPlace(this, other, 1);
         end
     end
 
-    table_reverse(result);
-    table_copy(another.bytes, result);
-    another.sign = divSign;
-    bigint_rstrip(another);
+    quotient.sign = divSign;
+    bigint_rstrip(quotient);
 
     if this.sign ~= 0 and otherSign == -1 then
         this.sign = -1;
     end
 
-    return another, this;
+    return quotient, this;
 end
 
 function bigint:Div(other)
@@ -525,6 +639,11 @@ function bigint:Mod(other)
 end
 
 function bigint:Pow(other)
+    return bigint_pow(self, other, false);
+end
+
+-- if async is true, yields progress while running in a coroutine
+function bigint_pow(self, other, async)
     other = bigint_ensureBigInt(other);
 
     if other.sign == 0 then
@@ -533,6 +652,8 @@ function bigint:Pow(other)
         return bigint.Zero;
     elseif other:IsOne() then
         return self;
+    elseif self.sign == 0 then
+        return bigint.Zero;
     end
 
     local sign = self.sign;
@@ -548,18 +669,43 @@ function bigint:Pow(other)
         return self:Shl(shift):SetSign(sign);
     end
 
-    -- multiply by self repeatedly
+    -- square and multiply for each bit of the exponent from the top,
+    -- alternating between two buffers
+    local topBit = other:Log2();
+    local tick;
+    if async then
+        -- sum the ticks of each step, sizing self raised to the exponent bits seen so far
+        -- from the bit length of self
+        local byteCount = #self;
+        local bitLength = math_log(self[byteCount]) / math_log(2);
+        if byteCount > 1 then
+            bitLength = (byteCount - 2) * 8 + math_log(self[byteCount] * 256 + self[byteCount - 1]) / math_log(2);
+        end
+        local sqrTicks = {};
+        local total = 0;
+        local power = 1;
+        for i = topBit:ToNumber(), 1, -1 do
+            total = total + bigint_sqrTicks(math_floor(power * bitLength / 8) + 1, sqrTicks);
+            power = power * 2;
+            if other:GetBit(i) == 1 then
+                total = total + (math_floor(power * bitLength / 8) + 1) * byteCount;
+                power = power + 1;
+            end
+        end
+        tick = bigint_newTicker(total);
+    end
     local this = self:Copy();
-    this.mutable = true;
-    local another = other:CopyIfImmutable():Abs():Add(bigint.NegOne);
-    local otherMutable = another.mutable;
-    another.mutable = true;
-    while another.sign ~= 0 do
-        this = this:Mul(self);
-        another = another:Add(bigint.NegOne);
-    end
-    this.mutable = false;
-    another.mutable = otherMutable;
+    local buffer = bigint_acquire();
+    for i = topBit:ToNumber(), 1, -1 do
+        bigint_sqrInto(buffer, this, tick);
+        this, buffer = buffer, this;
+        if other:GetBit(i) == 1 then
+            bigint_mulInto(buffer, this, self, tick);
+            this, buffer = buffer, this;
+        end
+    end
+    bigint_release(buffer);
+    bigint_release(topBit);
     this.sign = sign;
     return this;
 end
@@ -570,8 +716,8 @@ function bigint:Log2()
         return nil;
     end
 
-    local byteCount = #self.bytes;
-    local byte = self.bytes[byteCount];
+    local byteCount = #self;
+    local byte = self[byteCount];
     local bitNum = (byteCount - 1) * 8;
     while byte >= 1 do
         bitNum = bitNum + 1;
@@ -589,8 +735,8 @@ function bigint:ExactLog2()
     local i = 1;
     local power = 0;
     local foundOne = false;
-    while self.bytes[i] ~= nil do
-        local byte = self.bytes[i];
+    while self[i] ~= nil do
+        local byte = self[i];
         for _ = 1, 8, 1 do
             if byte % 2 < 1 then
                 if not foundOne then
@@ -623,16 +769,16 @@ function bigint:Shr(n)
 
     -- shift whole bytes
     local shiftBytes = math_floor(n / 8);
-    local byteCount = #self.bytes;
+    local byteCount = #self;
     if shiftBytes >= byteCount then
         return bigint.Zero;
     end
     local this = self:CopyIfImmutable();
     for i = shiftBytes + 1, byteCount, 1 do
-        this.bytes[i - shiftBytes] = this.bytes[i];
+        this[i - shiftBytes] = this[i];
     end
     for i = byteCount - shiftBytes + 1, byteCount, 1 do
-        this.bytes[i] = nil;
+        this[i] = nil;
     end
     byteCount = byteCount - shiftBytes;
 
@@ -645,16 +791,16 @@ function bigint:Shr(n)
     local shiftNum = 2 ^ shiftBits;
     local unshiftNum = 2 ^ (8 - shiftBits);
     for i = 1, byteCount, 1 do
-        local overflow = this.bytes[i] % shiftNum;
-        this.bytes[i] = math_floor(this.bytes[i] / shiftNum);
+        local overflow = this[i] % shiftNum;
+        this[i] = math_floor(this[i] / shiftNum);
         if i ~= 1 then
-            this.bytes[i - 1] = this.bytes[i - 1] + overflow * unshiftNum;
+            this[i - 1] = this[i - 1] + overflow * unshiftNum;
         end
     end
     
     -- strip zero
-    if this.bytes[byteCount] == 0 then
-        this.bytes[byteCount] = nil;
+    if this[byteCount] == 0 then
+        this[byteCount] = nil;
         if byteCount == 1 then
             this.sign = 0;
         end
@@ -674,16 +820,16 @@ function bigint:Shl(n)
 
     -- shift whole bytes
     local shiftBytes = math_floor(n / 8);
-    local byteCount = #self.bytes;
+    local byteCount = #self;
     local this = self:CopyIfImmutable();
     for i = byteCount + 1, byteCount + shiftBytes, 1 do
-        this.bytes[i] = 0;
+        this[i] = 0;
     end
     for i = byteCount + shiftBytes, shiftBytes + 1, -1 do
-        this.bytes[i] = this.bytes[i - shiftBytes];
+        this[i] = this[i - shiftBytes];
     end
     for i = shiftBytes, 1, -1 do
-        this.bytes[i] = 0;
+        this[i] = 0;
     end
     byteCount = byteCount + shiftBytes;
 
@@ -696,10 +842,10 @@ function bigint:Shl(n)
     local shiftNum = 2 ^ shiftBits;
     local unshiftNum = 2 ^ (8 - shiftBits);
     for i = byteCount, shiftBytes + 1, -1 do
-        local overflow = math_floor(this.bytes[i] / unshiftNum);
-        this.bytes[i] = (this.bytes[i] * shiftNum) % 256;
+        local overflow = math_floor(this[i] / unshiftNum);
+        this[i] = (this[i] * shiftNum) % 256;
         if overflow ~= 0 then
-            this.bytes[i + 1] = (this.bytes[i + 1] or 0) + overflow;
+            this[i + 1] = (this[i + 1] or 0) + overflow;
         end
     end
 
@@ -720,18 +866,18 @@ function bigint:Bor(other)
     end
 
     local this;
-    local count = #self.bytes;
-    local otherCount = #other.bytes;
+    local count = #self;
+    local otherCount = #other;
     if otherCount > count then
         count = otherCount;
     end
     for i = 1, count, 1 do
         local result = 0;
         local bit = 1;
-        local byte = (this or self).bytes[i];
+        local byte = (this or self)[i];
         local origByte = byte;
         byte = byte or 0;
-        local otherByte = other.bytes[i] or 0;
+        local otherByte = other[i] or 0;
         for _ = 1, 8, 1 do
             if (byte % 2) >= 1 or (otherByte % 2) >= 1 then
                 result = result + bit;
@@ -745,7 +891,7 @@ function bigint:Bor(other)
                 -- lazy copy
                 this = self:CopyIfImmutable();
             end
-            this.bytes[i] = result;
+            this[i] = result;
         end
     end
     return this or self;
@@ -765,18 +911,18 @@ function bigint:Band(other)
     end
 
     local this;
-    local count = #self.bytes;
-    local otherCount = #other.bytes;
+    local count = #self;
+    local otherCount = #other;
     if otherCount > count then
         count = otherCount;
     end
     for i = 1, count, 1 do
         local result = 0;
         local bit = 1;
-        local byte = (this or self).bytes[i];
+        local byte = (this or self)[i];
         byte = byte or 0;
         local origByte = byte;
-        local otherByte = other.bytes[i] or 0;
+        local otherByte = other[i] or 0;
         for _ = 1, 8, 1 do
             if (byte % 2) >= 1 and (otherByte % 2) >= 1 then
                 result = result + bit;
@@ -790,7 +936,7 @@ function bigint:Band(other)
                 -- lazy copy
                 this = self:CopyIfImmutable();
             end
-            this.bytes[i] = result;
+            this[i] = result;
         end
     end
     if this == nil then
@@ -815,18 +961,18 @@ function bigint:Bxor(other)
     end
 
     local this = self:CopyIfImmutable();
-    local count = #self.bytes;
-    local otherCount = #other.bytes;
+    local count = #self;
+    local otherCount = #other;
     if otherCount > count then
         count = otherCount;
     end
     for i = 1, count, 1 do
         local result = 0;
         local bit = 1;
-        local byte = this.bytes[i];
+        local byte = this[i];
         local origByte = byte;
         byte = byte or 0;
-        local otherByte = other.bytes[i] or 0;
+        local otherByte = other[i] or 0;
         for _ = 1, 8, 1 do
             if ((byte % 2) >= 1) ~= ((otherByte % 2) >= 1) then
                 result = result + bit;
@@ -835,7 +981,7 @@ function bigint:Bxor(other)
             otherByte = otherByte / 2;
             bit = bit * 2;
         end
-        this.bytes[i] = result;
+        this[i] = result;
     end
     bigint_rstrip(this);
     return this;
@@ -843,17 +989,17 @@ end
 
 function bigint:Bnot(size)
     local this = self:CopyIfImmutable();
-    local byteCount = #self.bytes;
+    local byteCount = #self;
     size = bigint_ensureInt(size, 1, nil, byteCount);
     if this.sign == 0 then
-        this.bytes[1] = 0xff;
+        this[1] = 0xff;
         this.sign = 1;
         return this;
     end
     for i = 1, byteCount, 1 do
         local result = 0;
         local bit = 1;
-        local byte = this.bytes[i];
+        local byte = this[i];
         for _ = 1, 8, 1 do
             if (byte % 2) < 1 then
                 result = result + bit;
@@ -861,15 +1007,77 @@ function bigint:Bnot(size)
             byte = byte / 2;
             bit = bit * 2;
         end
-        this.bytes[i] = result;
+        this[i] = result;
     end
     for i = byteCount + 1, size, 1 do
-        this.bytes[i] = 0xff;
+        this[i] = 0xff;
     end
     bigint_rstrip(this);
     return this;
 end
 
+-- bitwise operators with infinite-precision 2's complement semantics for negative values
+function bigint:BandS(other)
+    other = bigint_ensureBigInt(other);
+    return bigint_bitwiseS(self, other, 1);
+end
+
+function bigint:BorS(other)
+    other = bigint_ensureBigInt(other);
+    return bigint_bitwiseS(self, other, 2);
+end
+
+function bigint:BxorS(other)
+    other = bigint_ensureBigInt(other);
+    return bigint_bitwiseS(self, other, 3);
+end
+
+-- ~x == -x - 1
+function bigint:BnotS()
+    if self.sign == 0 then
+        return bigint.NegOne;
+    end
+    local this = self:Copy();
+    this.sign = -this.sign;
+    bigint_mutable[this] = true;
+    this = this:Add(bigint.NegOne);
+    bigint_mutable[this] = nil;
+    return this;
+end
+
+-- arithmetic shift right, rounding toward negative infinity
+function bigint:ShrS(n)
+    n = bigint_ensureInt(n);
+
+    if self.sign >= 0 or n <= 0 then
+        return self:Shr(n);
+    end
+
+    -- check whether any 1 bits are shifted out
+    local shiftBytes = math_floor(n / 8);
+    local lostBits = false;
+    for i = 1, shiftBytes, 1 do
+        if (self[i] or 0) ~= 0 then
+            lostBits = true;
+            break;
+        end
+    end
+    if not lostBits and (self[shiftBytes + 1] or 0) % (2 ^ (n % 8)) ~= 0 then
+        lostBits = true;
+    end
+
+    local this = self:Shr(n);
+    if not lostBits then
+        return this;
+    elseif this.sign == 0 then
+        return bigint.NegOne;
+    end
+    bigint_mutable[this] = true;
+    this = this:Add(bigint.NegOne);
+    bigint_mutable[this] = nil;
+    return this;
+end
+
 function bigint:SetBits(...)
     local arg = {...};
     local count = #arg;
@@ -878,7 +1086,7 @@ function bigint:SetBits(...)
     end
 
     local this;
-    local byteCount = #self.bytes;
+    local byteCount = #self;
     for i = 1, count, 1 do
         local bit = bigint_ensureInt(arg[i], 1);
         bit = bit - 1;
@@ -892,11 +1100,11 @@ function bigint:SetBits(...)
                 end
             end
             for j = byteCount + 1, byteNum, 1 do
-                this.bytes[j] = 0;
+                this[j] = 0;
             end
             byteCount = byteNum;
         end
-        local byte = (this or self).bytes[byteNum];
+        local byte = (this or self)[byteNum];
         local bitNum = 2 ^ (bit % 8);
         if (byte / bitNum) % 2 < 1 then
             if this == nil then
@@ -906,7 +1114,7 @@ function bigint:SetBits(...)
                     this.sign = 1;
                 end
             end
-            this.bytes[byteNum] = byte + bitNum;
+            this[byteNum] = byte + bitNum;
         end
     end
     return this or self;
@@ -927,7 +1135,7 @@ function bigint:UnsetBits(...)
         local bit = bigint_ensureInt(arg[i], 1);
         bit = bit - 1;
         local byteNum = math_floor(bit / 8) + 1;
-        local byte = (this or self).bytes[byteNum];
+        local byte = (this or self)[byteNum];
         if byte ~= nil then
             local bitNum = 2 ^ (bit % 8);
             if (byte / bitNum) % 2 >= 1 then
@@ -935,7 +1143,7 @@ function bigint:UnsetBits(...)
                     -- lazy copy
                     this = self:CopyIfImmutable();
                 end
-                this.bytes[byteNum] = byte - bitNum;
+                this[byteNum] = byte - bitNum;
             end
         end
     end
@@ -958,7 +1166,7 @@ function bigint:GetBit(i)
 
     i = i - 1;
     local byteNum = math_floor(i / 8) + 1;
-    local byte = self.bytes[byteNum];
+    local byte = self[byteNum];
     if byte == nil or byte == 0 then
         return 0;
     end
@@ -969,7 +1177,7 @@ end
 
 -- convert 2's complement unsigned number to signed
 function bigint:CastSigned(size)
-    local byteCount = #self.bytes;
+    local byteCount = #self;
     size = bigint_ensureInt(size, 1, nil, byteCount);
 
     if self.sign == 0 then
@@ -979,13 +1187,13 @@ function bigint:CastSigned(size)
     if byteCount > size then
         error("twos complement overflow");
     end
-    if self.sign == 1 and (self.bytes[size] or 0) > 0x7f then
+    if self.sign == 1 and (self[size] or 0) > 0x7f then
         local this = self:CopyIfImmutable();
-        local mutable = this.mutable;
-        this.mutable = true;
+        local mutable = bigint_mutable[this];
+        bigint_mutable[this] = true;
         this = this:Bnot(size):Add(bigint.One);
         this.sign = -1;
-        this.mutable = mutable;
+        bigint_mutable[this] = mutable;
         return this;
     end
 
@@ -994,7 +1202,7 @@ end
 
 -- convert 2's complement signed number to unsigned
 function bigint:CastUnsigned(size)
-    local byteCount = #self.bytes;
+    local byteCount = #self;
     size = bigint_ensureInt(size, 1, nil, byteCount);
 
     if self.sign == 0 then
@@ -1009,11 +1217,11 @@ function bigint:CastUnsigned(size)
     end
 
     local this = self:CopyIfImmutable();
-    local mutable = this.mutable;
-    this.mutable = true;
+    local mutable = bigint_mutable[this];
+    bigint_mutable[this] = true;
     this.sign = 1;
     this = this:Bnot(size):Add(bigint.One);
-    this.mutable = mutable;
+    bigint_mutable[this] = mutable;
     return this;
 end
 
@@ -1023,8 +1231,8 @@ end
 function bigint:CompareU(other)
     other = bigint_ensureBigInt(other);
 
-    local byteCount = #self.bytes;
-    local otherByteCount = #other.bytes;
+    local byteCount = #self;
+    local otherByteCount = #other;
 
     if byteCount < otherByteCount then
         return -1;
@@ -1033,9 +1241,9 @@ function bigint:CompareU(other)
     end
 
     for i = byteCount, 1, -1 do
-        if self.bytes[i] < other.bytes[i] then
+        if self[i] < other[i] then
             return -1;
-        elseif self.bytes[i] > other.bytes[i] then
+        elseif self[i] > other[i] then
             return 1;
         end
     end
@@ -1102,34 +1310,29 @@ end
 -- convert to string of bytes
 function bigint:ToBytes(size, littleEndian)
     littleEndian = bigint_ensureBool(littleEndian, false);
-    -- avoid copying array
-    local bytes = self.bytes;
-    local byteCount = #bytes;
+    local byteCount = #self;
     size = bigint_ensureInt(size, 1, nil, byteCount);
-    if byteCount < size then
-        for i = byteCount + 1, size, 1 do
-            bytes[i] = 0;
-        end
-    end
 
-    local byteStr;
-    if littleEndian then
-        byteStr = string_char(unpack(bytes, 1, size));
-    else
-        table_reverse(bytes);
-        if byteCount <= size then
-            byteStr = string_char(unpack(bytes));
-        else
-            byteStr = string_char(unpack(bytes, byteCount - size + 1, byteCount));
+    -- gather the bytes in output order into a temporary, as self may be shared
+    local bytes = bigint_acquire();
+    for i = 1, size, 1 do
+        local index = i;
+        if not littleEndian then
+            index = size - i + 1;
         end
-        table_reverse(bytes);
+        bytes[i] = self[index] or 0;
     end
 
-    -- restore original state
-    for i = size, byteCount + 1, -1 do
-        bytes[i] = nil;
+    -- convert in slices so unpack stays within the stack limit
+    local slices = {};
+    local sliceCount = 0;
+    for first = 1, size, bigint_unpackLimit do
+        local last = math_min(first + bigint_unpackLimit - 1, size);
+        sliceCount = sliceCount + 1;
+        slices[sliceCount] = string_char(unpack(bytes, first, last));
     end
-    return byteStr;
+    bigint_release(bytes);
+    return table_concat(slices, "", 1, sliceCount);
 end
 
 function bigint:ToNumber()
@@ -1137,8 +1340,8 @@ function bigint:ToNumber()
         error("integer too big to convert to lua number");
     end
     local total = 0;
-    for i = #self.bytes, 1, -1 do
-        total = (total * 256) + self.bytes[i];
+    for i = #self, 1, -1 do
+        total = (total * 256) + self[i];
     end
     return total * self.sign;
 end
@@ -1159,7 +1362,7 @@ function bigint:ToHex(noPrefix)
         end
     end
 
-    local bytes = table_copy(self.bytes);
+    local bytes = table_copy(self);
     table_reverse(bytes);
     local result = string_format("%x" .. ("%02x"):rep(#bytes - 1), unpack(bytes));
     if not noPrefix then
@@ -1184,9 +1387,9 @@ function bigint:ToBin(noPrefix)
     end
 
     local t = {};
-    local bytesCount = #self.bytes;
+    local bytesCount = #self;
     for i = 1, bytesCount, 1 do
-        local byte = self.bytes[i];
+        local byte = self[i];
         local start = (i - 1) * 8 + 1;
         for j = start, start + 7, 1 do
             if byte == 0 then
@@ -1217,49 +1420,460 @@ end
 
 -- general base conversion
 function bigint:ToBase(base)
-    base = bigint_ensureInt(base, 1, 36);
+    base = bigint_ensureInt(base, 2, 36);
 
     if base == 2 then
         return self:ToBin(true);
     elseif base == 16 then
         return self:ToHex(true);
     end
+    return bigint_toBase(self, base, false);
+end
+
+-- if async is true, yields progress while running in a coroutine
+function bigint_toBase(self, base, async)
+    local chunks = {};
+    bigint_writeBase(self, base, function(chunk)
+        chunks[#chunks + 1] = chunk;
+    end, math_huge, async);
+    return table_concat(chunks);
+end
+
+-- write the string representation to a writer function in chunks of about
+-- chunkSize digits; the concatenated output is identical to ToBase
+function bigint:WriteBase(base, writer, chunkSize)
+    base = bigint_ensureInt(base, 2, 36);
+    writer = bigint_ensureFunction(writer);
+    chunkSize = bigint_ensureInt(chunkSize, 1, nil, 65536);
+    bigint_writeBase(self, base, writer, chunkSize, false);
+end
 
+-- if async is true, yields progress while running in a coroutine
+function bigint_writeBase(self, base, writer, chunkSize, async)
     if self.sign == 0 then
-        return "0";
+        writer("0");
+        return;
+    end
+
+    -- split into little-endian groups of groupSize digits
+    local groups;
+    local groupSize;
+    if base == 16 then
+        groups = self;
+        groupSize = 2;
+    elseif base == 2 then
+        groups = self;
+        groupSize = 8;
+    else
+        local factor;
+        groupSize, factor = bigint_groupSize(base);
+        local byteCount = #self;
+        local bytes = bigint_acquire();
+        for i = 1, byteCount, 1 do
+            bytes[i] = self[i];
+        end
+        local tick;
+        if async then
+            -- each group takes one pass over the shrinking bytes
+            local groupCount = byteCount * math_log(256) / math_log(factor);
+            tick = bigint_newTicker(byteCount * groupCount / 2);
+        end
+        groups = bigint_acquire();
+        local groupCount = 0;
+        while bytes[1] ~= nil do
+            groupCount = groupCount + 1;
+            groups[groupCount] = bigint_divModSmall(bytes, factor);
+            if tick ~= nil then
+                tick(#bytes);
+            end
+        end
+        bigint_release(bytes);
     end
 
-    local result = {};
-    for i = #self.bytes, 1, -1 do
-        -- multiply by 256
-        local carry = 0;
-        local j = 1;
-        while result[j] ~= nil or carry ~= 0 do
-            local product = (result[j] or 0) * 256 + carry;
-            result[j] = product % base;
-            carry = math_floor(product / base);
-            j = j + 1;
+    local buffer = {};
+    local bufferCount = 0;
+    local digitCount = 0;
+    local groupDigits = {};
+    if self.sign == -1 then
+        bufferCount = 1;
+        buffer[1] = "-";
+    end
+    local groupCount = #groups;
+    for i = groupCount, 1, -1 do
+        local value = groups[i];
+        for j = groupSize, 1, -1 do
+            local digit = value % base;
+            groupDigits[j] = bigint_digits[digit + 1];
+            value = (value - digit) / base;
+        end
+        local groupStr = table_concat(groupDigits);
+        if i == groupCount then
+            groupStr = string_gsub(groupStr, "^0+", "");
         end
+        bufferCount = bufferCount + 1;
+        buffer[bufferCount] = groupStr;
+        digitCount = digitCount + groupSize;
+        if digitCount >= chunkSize or i == 1 then
+            writer(table_concat(buffer, "", 1, bufferCount));
+            bufferCount = 0;
+            digitCount = 0;
+        end
+    end
+    if not rawequal(groups, self) then
+        bigint_release(groups);
+    end
+end
+
+--##### LITERAL CACHE #####--
+
+-- the cache is a hash per base of literals to nodes in a circular doubly linked list,
+-- ordered from most recently used after bigint_cacheList to least recently used before it
+-- base 0 holds numbers and strings without an explicit base
+
+function bigint.SetCacheCapacity(capacity)
+    bigint_cacheCapacity = bigint_ensureInt(capacity, 0);
+    bigint.ClearCache();
+end
 
-        -- add byte
-        j = 1;
-        carry = self.bytes[i];
-        while carry ~= 0 do
-            local sum = (result[j] or 0) + carry;
-            result[j] = sum % base;
-            carry = math_floor(sum / base);
-            j = j + 1;
+function bigint.ClearCache()
+    bigint_cacheEntries = {};
+    bigint_cacheList = {};
+    bigint_cacheList.prev = bigint_cacheList;
+    bigint_cacheList.next = bigint_cacheList;
+    bigint_cacheCount = 0;
+    bigint_cacheHits = 0;
+    bigint_cacheMisses = 0;
+end
+
+function bigint.GetCacheStats()
+    return {
+        hits = bigint_cacheHits,
+        misses = bigint_cacheMisses,
+        count = bigint_cacheCount,
+        capacity = bigint_cacheCapacity,
+    };
+end
+
+-- return the cached bigint for a string or number literal, constructing it on a miss
+function bigint_cacheLookup(value, base)
+    local valueType = type(value);
+    if valueType == "number" then
+        base = nil;
+    end
+    -- long strings are not kept, so huge literals don't stay alive until evicted
+    if bigint_cacheCapacity == 0 or value ~= value or (base ~= nil and type(base) ~= "number")
+        or (valueType == "string" and #value > bigint_cacheMaxLength) then
+        if valueType == "string" then
+            return bigint.FromString(value, base);
         end
+        return bigint.FromNumber(value);
     end
-    table_reverse(result);
-    for i = #result, 1, -1 do
-        result[i] = bigint_digits[result[i] + 1];
+
+    local entries = bigint_cacheEntries[base or 0];
+    if entries == nil then
+        entries = {};
+        bigint_cacheEntries[base or 0] = entries;
     end
-    local result = table_concat(result);
-    if self.sign == -1 then
-        result = "-" .. result;
+    local list = bigint_cacheList;
+    local node = entries[value];
+    if node ~= nil then
+        bigint_cacheHits = bigint_cacheHits + 1;
+        -- unlink
+        node.prev.next = node.next;
+        node.next.prev = node.prev;
+    else
+        bigint_cacheMisses = bigint_cacheMisses + 1;
+        local this;
+        if valueType == "string" then
+            this = bigint.FromString(value, base);
+        else
+            this = bigint.FromNumber(value);
+        end
+        if bigint_cacheCount >= bigint_cacheCapacity then
+            -- evict least recently used and reuse its node
+            node = list.prev;
+            node.prev.next = list;
+            list.prev = node.prev;
+            node.entries[node.key] = nil;
+        else
+            node = {};
+            bigint_cacheCount = bigint_cacheCount + 1;
+        end
+        node.entries = entries;
+        node.key = value;
+        node.value = this;
+        entries[value] = node;
+    end
+
+    -- link as most recently used
+    node.prev = list;
+    node.next = list.next;
+    list.next.prev = node;
+    list.next = node;
+    return node.value;
+end
+
+--##### ASYNC #####--
+
+-- variants of long-running operations that yield the estimated fraction of work done
+-- every YieldInterval limb operations when called from a coroutine
+bigint.Async = {
+    YieldInterval = 10000,
+};
+
+function bigint.Async.DivWithRemainder(self, other, ignoreRemainder)
+    return bigint_divWithRemainder(bigint_ensureBigInt(self), other, ignoreRemainder, true);
+end
+
+function bigint.Async.Div(self, other)
+    local quotient, remainder = bigint.Async.DivWithRemainder(self, other, true);
+    return quotient;
+end
+
+function bigint.Async.Mod(self, other)
+    local quotient, remainder = bigint.Async.DivWithRemainder(self, other);
+    return remainder;
+end
+
+function bigint.Async.Pow(self, other)
+    return bigint_pow(bigint_ensureBigInt(self), other, true);
+end
+
+function bigint.Async.ToBase(self, base)
+    self = bigint_ensureBigInt(self);
+    base = bigint_ensureInt(base, 2, 36);
+
+    if base == 2 then
+        return self:ToBin(true);
+    elseif base == 16 then
+        return self:ToHex(true);
     end
-    return result;
+    return bigint_toBase(self, base, true);
+end
+
+--##### COMPILER #####--
+
+-- parse an infix expression string into an s-expression
+-- operators and precedence follow Lua 5.3: | ~ & << >> + - * / // % unary - ^
+function bigint_parseExpression(str)
+    local tokens = {};
+    local pos = 1;
+    local length = #str;
+    while pos <= length do
+        local _, tokenEnd = string_find(str, "^%s+", pos);
+        if tokenEnd == nil then
+            _, tokenEnd = string_find(str, "^0[xb]%w+", pos);
+            if tokenEnd == nil then
+                _, tokenEnd = string_find(str, "^[%w_]+", pos);
+            end
+            if tokenEnd == nil then
+                _, tokenEnd = string_find(str, "^[/<>][/<>]", pos);
+            end
+            if tokenEnd == nil then
+                tokenEnd = pos;
+            end
+            tokens[#tokens + 1] = string_sub(str, pos, tokenEnd);
+        end
+        pos = tokenEnd + 1;
+    end
+
+    local binopPrecedence = {
+        ["|"] = 1, ["~"] = 2, ["&"] = 3, ["<<"] = 4, [">>"] = 4, ["+"] = 5, ["-"] = 5,
+        ["*"] = 6, ["/"] = 6, ["//"] = 6, ["%"] = 6, ["^"] = 8,
+    };
+    local unaryPrecedence = 7;
+    local symbolMap = {["~"] = "^", ["//"] = "/", ["^"] = "pow"};
+
+    local i = 1;
+    local parse;
+    local function parseOperand()
+        local token = tokens[i];
+        i = i + 1;
+        if token == "(" then
+            local node = parse(0);
+            if tokens[i] ~= ")" then
+                error("invalid expression; expected )");
+            end
+            i = i + 1;
+            return node;
+        elseif token == "-" then
+            return {"-", parse(unaryPrecedence)};
+        elseif token ~= nil and string_find(token, "^[%w_]") then
+            return token;
+        end
+        error("invalid expression; unexpected " .. (token or "end of expression"));
+    end
+    function parse(minPrecedence)
+        local node = parseOperand();
+        while true do
+            local op = tokens[i];
+            local precedence = binopPrecedence[op];
+            if precedence == nil or precedence <= minPrecedence then
+                break;
+            end
+            i = i + 1;
+            -- ^ is right associative
+            if op == "^" then
+                precedence = precedence - 1;
+            end
+            node = {symbolMap[op] or op, node, parse(precedence)};
+        end
+        return node;
+    end
+
+    local sexp = parse(0);
+    if tokens[i] ~= nil then
+        error("invalid expression; unexpected " .. tokens[i]);
+    end
+    return sexp;
+end
+
+-- compile an expression string or s-expression into a function
+-- variables become parameters in the order of params, or in order of first appearance
+-- intermediate results are kept in preallocated scratch bigints, and
+-- +, -, *, % and unary minus are evaluated in place in the result
+function bigint.Compile(expression, params)
+    if type(expression) == "string" then
+        expression = bigint_parseExpression(expression);
+    end
+    -- a lone variable or constant compiles to a function returning its value
+    local exprType = type(expression);
+    if exprType ~= "string" and exprType ~= "number" and not bigint.IsBigInt(expression) then
+        expression = bigint_ensureArray(expression);
+    end
+    params = bigint_ensureArray(params, {});
+
+    local paramIndex = {};
+    for i = 1, #params, 1 do
+        paramIndex[bigint_ensureString(params[i])] = i;
+    end
+    local paramsFixed = #params > 0;
+    local constants = {};
+    local temps = {};
+    local lines = {};
+    local tempTop = 0;
+
+    local function newTemp()
+        tempTop = tempTop + 1;
+        if temps[tempTop] == nil then
+            temps[tempTop] = bigint.New();
+        end
+        return "t[" .. tempTop .. "]";
+    end
+
+    local function emit(...)
+        lines[#lines + 1] = table_concat({"    ", ...});
+    end
+
+    local function compileLeaf(node)
+        if type(node) == "string" and string_find(node, "^[%a_][%w_]*$") then
+            if paramIndex[node] == nil then
+                if paramsFixed then
+                    error("unknown variable: " .. node);
+                end
+                params[#params + 1] = node;
+                paramIndex[node] = #params;
+            end
+            return "p" .. paramIndex[node];
+        end
+        constants[#constants + 1] = bigint_ensureBigInt(node);
+        return "k[" .. #constants .. "]";
+    end
+
+    -- evaluate node and return the name of a variable holding its value,
+    -- which is either a leaf or dest
+    local function compileNode(node, dest)
+        if type(node) ~= "table" or bigint.IsBigInt(node) then
+            return compileLeaf(node);
+        end
+
+        local savedTop = tempTop;
+        local symbol = node[1];
+        local left = node[2];
+        local right = node[3];
+        if #node == 2 and (symbol == "-" or symbol == "abs") then
+            local value = compileNode(left, dest);
+            if value ~= dest then
+                emit("copyInto(", dest, ", ", value, ");");
+            end
+            if symbol == "-" then
+                emit(dest, ".sign = -", dest, ".sign;");
+            else
+                emit(dest, ".sign = ", dest, ".sign * ", dest, ".sign;");
+            end
+        elseif #node == 3 and (symbol == "+" or symbol == "-") then
+            local sign = (symbol == "-") and "-1" or "1";
+            if type(left) ~= "table" and type(right) == "table" then
+                -- evaluate the subexpression in place and add the leaf to it
+                local leaf = compileLeaf(left);
+                local value = compileNode(right, dest);
+                if value ~= dest then
+                    emit("copyInto(", dest, ", ", value, ");");
+                end
+                if symbol == "-" then
+                    emit(dest, ".sign = -", dest, ".sign;");
+                end
+                emit("addInPlace(", dest, ", ", leaf, ", 1);");
+            else
+                local value = compileNode(left, dest);
+                local other = compileNode(right, newTemp());
+                if value ~= dest then
+                    emit("copyInto(", dest, ", ", value, ");");
+                end
+                emit("addInPlace(", dest, ", ", other, ", ", sign, ");");
+            end
+        elseif #node == 3 and symbol == "*" then
+            local value = compileNode(left, newTemp());
+            local other = value;
+            if type(left) == "table" or left ~= right then
+                other = compileNode(right, newTemp());
+            end
+            if value == other then
+                emit("sqrInto(", dest, ", ", value, ");");
+            else
+                emit("mulInto(", dest, ", ", value, ", ", other, ");");
+            end
+        elseif #node == 3 and symbol == "%" then
+            local value = compileNode(left, dest);
+            local other = compileNode(right, newTemp());
+            if value ~= dest then
+                emit("copyInto(", dest, ", ", value, ");");
+            end
+            emit("modInPlace(", dest, ", ", other, ");");
+        elseif #node == 3 and bigint_compileOps[symbol] ~= nil then
+            local value = compileNode(left, newTemp());
+            local other = compileNode(right, newTemp());
+            emit("copyInto(", dest, ", ops[\"", symbol, "\"](", value, ", ", other, "));");
+        else
+            error("invalid expression; unknown operator: " .. tostring(symbol));
+        end
+        tempTop = savedTop;
+        return dest;
+    end
+
+    local result = compileNode(expression, "result");
+
+    local paramNames = {};
+    for i = 1, #params, 1 do
+        paramNames[i] = "p" .. i;
+    end
+    local paramList = table_concat(paramNames, ", ");
+    local header = {
+        "local ensureBigInt, copyInto, addInPlace, mulInto, sqrInto, modInPlace, ops, new, k, t = ...;",
+        "return function(" .. paramList .. ")",
+    };
+    for i = 1, #params, 1 do
+        header[#header + 1] = "    p" .. i .. " = ensureBigInt(p" .. i .. ");";
+    end
+    if result == "result" then
+        header[#header + 1] = "    local result = new();";
+    end
+    lines[#lines + 1] = "    return " .. result .. ";";
+    lines[#lines + 1] = "end";
+    local source = table_concat(header, "\n") .. "\n" .. table_concat(lines, "\n");
+    local f = loadstring(source)(bigint_ensureBigInt, bigint_copyInto, bigint_addInPlace, bigint_mulInto,
+        bigint_sqrInto, bigint_modInPlace, bigint_compileOps, bigint.New, constants, temps);
+    return f, params;
 end
 
 --##### METATABLE #####--
@@ -1297,7 +1911,7 @@ bigint_mt = {
 
 function bigint:Copy()
     local copy = bigint.New();
-    table_copy(copy.bytes, self.bytes);
+    table_copy(copy, self);
     copy.sign = self.sign;
     return copy;
 end
@@ -1305,7 +1919,7 @@ end
 -- return a copy if immutable or self otherwise
 -- if other is not nil, copy it instead
 function bigint:CopyIfImmutable()
-    if self.mutable then
+    if bigint_mutable[self] then
         return self;
     else
         return self:Copy()
@@ -1316,17 +1930,333 @@ function bigint:IsEven()
     if self.sign == 0 then
         return true;
     end
-    return self.bytes[1] % 2 == 0;
+    return self[1] % 2 == 0;
 end
 
 function bigint:IsOne()
-    return self.bytes[2] == nil and self.bytes[1] == 1;
+    return self[2] == nil and self[1] == 1;
+end
+
+-- long division of bytes by otherBytes in place, leaving the unstripped remainder in bytes
+-- if quotient is not nil, the unstripped little-endian quotient is stored in it
+function bigint_divLoop(bytes, otherBytes, quotient, tick)
+    local byteCount = #bytes;
+    local otherByteCount = #otherBytes;
+    local divIdx = byteCount - otherByteCount + 1;
+    while divIdx >= 1 do
+        local factor = 0;
+        repeat
+            -- check if divisor is smaller
+            local foundFactor = false;
+            local sliceSize = otherByteCount;
+            if divIdx + sliceSize <= byteCount and bytes[divIdx + sliceSize] ~= 0 then
+                sliceSize = sliceSize + 1;
+            end
+            for i = sliceSize, 1, -1 do
+                local byte = bytes[divIdx + i - 1] or 0;
+                local otherByte = otherBytes[i] or 0;
+                if otherByte < byte then
+                    foundFactor = false;
+                    break;
+                elseif otherByte > byte then
+                    foundFactor = true;
+                    break;
+                end
+            end
+
+            -- subtract divisor
+            if not foundFactor then
+                factor = factor + 1;
+                local carry = 0;
+                local i = 1;
+                while i <= sliceSize or carry ~= 0 do
+                    local j = divIdx + i - 1;
+                    local diff = (bytes[j] or 0) - (otherBytes[i] or 0) + carry;
+                    if diff < 0 then
+                        carry = -1;
+                        diff = diff + 256;
+                    else
+                        carry = 0;
+                    end
+                    bytes[j] = diff;
+                    i = i + 1;
+                end
+            end
+        until foundFactor;
+
+        -- set digit
+        if quotient ~= nil then
+            quotient[divIdx] = factor;
+        end
+        if tick ~= nil then
+            tick((factor + 1) * otherByteCount);
+        end
+
+        divIdx = divIdx - 1;
+    end
+
+end
+
+-- take a cleared bigint from the free list of temporaries, or create one
+function bigint_acquire()
+    local count = #bigint_pool;
+    if count == 0 then
+        return bigint.New();
+    end
+    local this = bigint_pool[count];
+    bigint_pool[count] = nil;
+    return this;
+end
+
+-- return a temporary that is no longer referenced to the free list
+-- its array part keeps its capacity, so reusing it doesn't allocate
+function bigint_release(self)
+    local count = #bigint_pool;
+    if count < bigint_poolLimit then
+        for i = #self, 1, -1 do
+            self[i] = nil;
+        end
+        self.sign = 0;
+        bigint_mutable[self] = nil;
+        bigint_pool[count + 1] = self;
+    end
+end
+
+-- copy the value of other into self without allocating
+function bigint_copyInto(self, other)
+    local bytes = self;
+    local otherBytes = other;
+    local byteCount = #bytes;
+    local otherByteCount = #otherBytes;
+    for i = 1, otherByteCount, 1 do
+        bytes[i] = otherBytes[i];
+    end
+    for i = byteCount, otherByteCount + 1, -1 do
+        bytes[i] = nil;
+    end
+    self.sign = other.sign;
+end
+
+-- add sign * other to self in place
+function bigint_addInPlace(self, other, sign)
+    if sign == -1 then
+        self.sign = -self.sign;
+    end
+    local mutable = bigint_mutable[self];
+    bigint_mutable[self] = true;
+    local result = self:Add(other);
+    bigint_mutable[self] = mutable;
+    if not rawequal(result, self) then
+        bigint_copyInto(self, result);
+    end
+    if sign == -1 then
+        self.sign = -self.sign;
+    end
+end
+
+-- store the product of x and y in self, which must not be x or y
+-- if tick is not nil, it is called with the number of operations done after each row
+function bigint_mulInto(self, x, y, tick)
+    local result = self;
+    local resultCount = #result;
+    if x.sign == 0 or y.sign == 0 then
+        for i = resultCount, 1, -1 do
+            result[i] = nil;
+        end
+        self.sign = 0;
+        return;
+    end
+
+    local bytes = x;
+    local otherBytes = y;
+    local byteCount = #bytes;
+    local otherByteCount = #otherBytes;
+    local productCount = byteCount + otherByteCount;
+    for i = 1, productCount, 1 do
+        result[i] = 0;
+    end
+    for i = resultCount, productCount + 1, -1 do
+        result[i] = nil;
+    end
+    for i = 1, otherByteCount, 1 do
+        local otherByte = otherBytes[i];
+        if otherByte ~= 0 then
+            local carry = 0;
+            for j = 1, byteCount, 1 do
+                local resultIdx = i + j - 1;
+                local product = bytes[j] * otherByte + carry + result[resultIdx];
+                carry = math_floor(product / 256);
+                result[resultIdx] = product - carry * 256;
+            end
+            result[i + byteCount] = carry;
+        end
+        if tick ~= nil then
+            tick(byteCount);
+        end
+    end
+    if result[productCount] == 0 then
+        result[productCount] = nil;
+    end
+    self.sign = x.sign * y.sign;
+end
+
+-- store the square of x in self, which must not be x
+-- cross products are computed once and doubled, and large operands are split
+-- in halves so that only three half-size squares are needed
+function bigint_sqrInto(self, x, tick)
+    local result = self;
+    local resultCount = #result;
+    local bytes = x;
+    local byteCount = #bytes;
+    local productCount = byteCount * 2;
+    for i = resultCount, 1, -1 do
+        result[i] = nil;
+    end
+    if x.sign == 0 then
+        self.sign = 0;
+        return;
+    end
+    self.sign = 1;
+
+    if byteCount >= bigint_sqrThreshold then
+        -- (high * b + low)^2 = high^2 * b^2 + ((high + low)^2 - high^2 - low^2) * b + low^2
+        local half = math_floor(byteCount / 2);
+        local low = bigint_acquire();
+        local high = bigint_acquire();
+        for i = 1, half, 1 do
+            low[i] = bytes[i];
+        end
+        for i = half + 1, byteCount, 1 do
+            high[i - half] = bytes[i];
+        end
+        low.sign = 1;
+        high.sign = 1;
+        bigint_rstrip(low);
+        local lowSqr = bigint_acquire();
+        local highSqr = bigint_acquire();
+        local middle = bigint_acquire();
+        bigint_sqrInto(lowSqr, low, tick);
+        bigint_sqrInto(highSqr, high, tick);
+        bigint_addInPlace(low, high, 1);
+        bigint_sqrInto(middle, low, tick);
+        bigint_addInPlace(middle, lowSqr, -1);
+        bigint_addInPlace(middle, highSqr, -1);
+
+        for i = 1, productCount, 1 do
+            result[i] = 0;
+        end
+        bigint_addBytesAt(result, lowSqr, 0);
+        bigint_addBytesAt(result, middle, half);
+        bigint_addBytesAt(result, highSqr, half * 2);
+        bigint_rstrip(self);
+        bigint_release(low);
+        bigint_release(high);
+        bigint_release(lowSqr);
+        bigint_release(highSqr);
+        bigint_release(middle);
+        return;
+    end
+
+    -- cross products
+    for i = 1, productCount, 1 do
+        result[i] = 0;
+    end
+    for i = 1, byteCount - 1, 1 do
+        local byte = bytes[i];
+        if byte ~= 0 then
+            local carry = 0;
+            for j = i + 1, byteCount, 1 do
+                local resultIdx = i + j - 1;
+                local product = byte * bytes[j] + carry + result[resultIdx];
+                carry = math_floor(product / 256);
+                result[resultIdx] = product - carry * 256;
+            end
+            result[i + byteCount] = carry;
+        end
+        if tick ~= nil then
+            tick(byteCount - i);
+        end
+    end
+
+    -- double the cross products and add the squares
+    local carry = 0;
+    for i = 1, byteCount, 1 do
+        local square = bytes[i] * bytes[i];
+        local squareHigh = math_floor(square / 256);
+        local sum = result[i * 2 - 1] * 2 + square - squareHigh * 256 + carry;
+        carry = math_floor(sum / 256);
+        result[i * 2 - 1] = sum - carry * 256;
+        sum = result[i * 2] * 2 + squareHigh + carry;
+        carry = math_floor(sum / 256);
+        result[i * 2] = sum - carry * 256;
+    end
+    bigint_rstrip(self);
+end
+
+-- number of ticks bigint_sqrInto reports when squaring byteCount bytes
+-- memo holds the counts of split sizes, as each size recurs across the halves
+function bigint_sqrTicks(byteCount, memo)
+    if byteCount < bigint_sqrThreshold then
+        return byteCount * (byteCount - 1) / 2;
+    end
+    local ticks = memo[byteCount];
+    if ticks == nil then
+        local half = math_floor(byteCount / 2);
+        -- the sum of the halves squared in the middle may carry into one more byte,
+        -- which can cross bigint_sqrThreshold either way, so count the larger of the two
+        local highTicks = bigint_sqrTicks(byteCount - half, memo);
+        ticks = bigint_sqrTicks(half, memo) + highTicks
+            + math_max(highTicks, bigint_sqrTicks(byteCount - half + 1, memo));
+        memo[byteCount] = ticks;
+    end
+    return ticks;
+end
+
+-- add little-endian bytes to result starting offset bytes in
+function bigint_addBytesAt(result, bytes, offset)
+    local carry = 0;
+    local i = 1;
+    local byte = bytes[1];
+    while byte ~= nil or carry ~= 0 do
+        local resultIdx = i + offset;
+        local sum = (result[resultIdx] or 0) + (byte or 0) + carry;
+        if sum >= 256 then
+            result[resultIdx] = sum - 256;
+            carry = 1;
+        else
+            result[resultIdx] = sum;
+            carry = 0;
+        end
+        i = i + 1;
+        byte = bytes[i];
+    end
+end
+
+-- replace self with self % other in place, with the same semantics as Mod
+function bigint_modInPlace(self, other)
+    if self.sign == 0 then
+        return;
+    end
+    local ucomp = self:CompareU(other);
+    if other.sign == 0 or ucomp == 0 then
+        bigint_copyInto(self, bigint.Zero);
+        return;
+    end
+    if ucomp == 1 then
+        bigint_divLoop(self, other);
+        bigint_rstrip(self);
+    end
+
+    -- if remainder has the wrong sign, add divisor to fix it
+    if self.sign ~= 0 and self.sign ~= other.sign then
+        bigint_addInPlace(self, other, 1);
+    end
 end
 
 function bigint_rstrip(self)
-    local i = #self.bytes;
-    while self.bytes[i] == 0 do
-        self.bytes[i] = nil;
+    local i = #self;
+    while self[i] == 0 do
+        self[i] = nil;
         i = i - 1;
     end
     if i == 0 then
@@ -1374,6 +2304,16 @@ function bigint_ensureArray(obj, default)
     error("invalid argument; expected array");
 end
 
+function bigint_ensureFunction(obj, default)
+    if obj == nil and default ~= nil then
+        return default;
+    end
+    if type(obj) == "function" then
+        return obj;
+    end
+    error("invalid argument; expected function");
+end
+
 function bigint_ensureString(obj, default)
     if obj == nil and default ~= nil then
         return default;
@@ -1394,6 +2334,154 @@ function bigint_ensureBool(obj, default)
     error("invalid argument; expected boolean");
 end
 
+-- 2's complement and, or, xor (mode 1, 2, 3) of self and other
+-- negative operands and the result are complemented on the fly in a single pass
+function bigint_bitwiseS(self, other, mode)
+    local negative = self.sign == -1;
+    local otherNegative = other.sign == -1;
+    local resultNegative;
+    if mode == 1 then
+        resultNegative = negative and otherNegative;
+    elseif mode == 2 then
+        resultNegative = negative or otherNegative;
+    else
+        resultNegative = negative ~= otherNegative;
+    end
+
+    local bytes = self;
+    local otherBytes = other;
+    local count = #bytes;
+    local otherCount = #otherBytes;
+    if otherCount > count then
+        count = otherCount;
+    end
+    local this = bigint.New();
+    local result = this;
+    local carry = 1;
+    local otherCarry = 1;
+    local resultCarry = 1;
+    for i = 1, count, 1 do
+        local byte = bytes[i] or 0;
+        if negative then
+            byte = 255 - byte + carry;
+            if byte == 256 then
+                byte = 0;
+            else
+                carry = 0;
+            end
+        end
+        local otherByte = otherBytes[i] or 0;
+        if otherNegative then
+            otherByte = 255 - otherByte + otherCarry;
+            if otherByte == 256 then
+                otherByte = 0;
+            else
+                otherCarry = 0;
+            end
+        end
+
+        local resultByte = 0;
+        local bit = 1;
+        for _ = 1, 8, 1 do
+            local b1 = byte % 2;
+            local b2 = otherByte % 2;
+            if (mode == 1 and b1 + b2 == 2) or (mode == 2 and b1 + b2 >= 1) or (mode == 3 and b1 + b2 == 1) then
+                resultByte = resultByte + bit;
+            end
+            byte = (byte - b1) / 2;
+            otherByte = (otherByte - b2) / 2;
+            bit = bit * 2;
+        end
+
+        if resultNegative then
+            resultByte = 255 - resultByte + resultCarry;
+            if resultByte == 256 then
+                resultByte = 0;
+            else
+                resultCarry = 0;
+            end
+        end
+        result[i] = resultByte;
+    end
+
+    if resultNegative then
+        if resultCarry == 1 then
+            result[count + 1] = 1;
+        end
+        this.sign = -1;
+    else
+        this.sign = 1;
+    end
+    bigint_rstrip(this);
+    return this;
+end
+
+-- if running in a coroutine, return a function counting operations that yields the
+-- estimated fraction of the total done every bigint.Async.YieldInterval operations
+function bigint_newTicker(total)
+    local co, isMain = coroutine_running();
+    if co == nil or isMain then
+        return nil;
+    end
+    local interval = bigint.Async.YieldInterval;
+    local done = 0;
+    local pending = 0;
+    return function(count)
+        pending = pending + count;
+        if pending >= interval then
+            done = done + pending;
+            pending = 0;
+            coroutine_yield(math_min(done / total, 1));
+        end
+    end
+end
+
+-- return the largest number of digits in base whose value fits in limit (default bigint_smallLimit)
+-- along with base raised to that number
+function bigint_groupSize(base, limit)
+    limit = limit or bigint_smallLimit;
+    local size = 1;
+    local factor = base;
+    while factor * base <= limit do
+        factor = factor * base;
+        size = size + 1;
+    end
+    return size, factor;
+end
+
+-- multiply little-endian bytes by factor and add addend in place
+-- factor and addend must not exceed bigint_smallLimit
+function bigint_mulAddSmall(bytes, factor, addend)
+    local carry = addend;
+    local i = 1;
+    local byte = bytes[1];
+    while byte ~= nil or carry ~= 0 do
+        local product = (byte or 0) * factor + carry;
+        carry = math_floor(product / 256);
+        bytes[i] = product - carry * 256;
+        i = i + 1;
+        byte = bytes[i];
+    end
+end
+
+-- divide little-endian bytes by divisor in place and return the remainder
+-- divisor must not exceed bigint_smallLimit
+function bigint_divModSmall(bytes, divisor)
+    local remainder = 0;
+    local byteCount = #bytes;
+    for i = byteCount, 1, -1 do
+        local value = remainder * 256 + bytes[i];
+        local quotient = math_floor(value / divisor);
+        remainder = value - quotient * divisor;
+        bytes[i] = quotient;
+    end
+    while bytes[byteCount] == 0 do
+        bytes[byteCount] = nil;
+        byteCount = byteCount - 1;
+    end
+    return remainder;
+end
+
 function table_reverse(t)
     local size = #t;
     local mid = #t / 2;
@@ -1425,7 +2513,29 @@ end
 
 bigint.internal = {};
 
+-- bigints that operations may modify in place instead of copying
+bigint_mutable = setmetatable({}, {__mode = "k"});
+
+-- free list of temporaries used inside composite operations
+bigint_pool = {};
+bigint_poolLimit = 16;
+
+-- number of values passed through unpack at once, well under the C stack limit
+bigint_unpackLimit = 4096;
+
 bigint_digits = {"0", "1", "2", "3", "4", "5", "6", "7", "8", "9", "a", "b", "c", "d", "e", "f", "g", "h", "i", "j", "k", "l", "m", "n", "o", "p", "q", "r", "s", "t", "u", "v", "w", "x", "y", "z"};
+-- operand size in bytes from which squaring is split recursively
+bigint_sqrThreshold = 64;
+
+bigint_compileOps = {
+    ["/"] = bigint.Div,
+    ["&"] = bigint.Band,
+    ["|"] = bigint.Bor,
+    ["^"] = bigint.Bxor,
+    ["pow"] = bigint.Pow,
+    ["<<"] = bigint.Shl,
+    [">>"] = bigint.Shr,
+};
 bigint_comparatorMap = {
     ["=="] = bigint.Eq,
     ["~="] = bigint.Ne,
@@ -1435,15 +2545,30 @@ bigint_comparatorMap = {
     [">="] = bigint.Ge
 };
 
+-- longest string literal kept in the cache
+bigint_cacheMaxLength = 256;
+bigint.SetCacheCapacity(256);
+
 bigint.Zero = bigint.New();
 bigint.One = bigint.FromNumber(1);
 bigint.NegOne = bigint.FromNumber(-1);
 bigint.Two = bigint.FromNumber(2);
 
 -- determine the max accurate integer supported by this build of Lua
+-- along with the largest factor that can be safely used by the small-number helpers,
+-- the bound on digit groups passed to tonumber with a base, which goes through C strtoul
+-- on Lua 5.1 and LuaJIT where unsigned long may be 32 bits,
+-- and the number of bytes the hex/bin parser reads with each tonumber
 if 0x1000000 == 0x1000001 then
+    bigint_smallLimit = 0x1000;
+    bigint_parseLimit = 0x1000;
+    bigint_parseChunkBytes = 2;
     bigint.MaxNumber = bigint.FromString("0xffffff");           -- max integer that can be accurately represented by a float
 else
+    bigint_smallLimit = 0x10000000000;
+    bigint_parseLimit = 0x100000000;
+    -- 3 bytes rather than 6 so that each chunk fits strtoul on 32-bit builds
+    bigint_parseChunkBytes = 3;
     bigint.MaxNumber = bigint.FromString("0x1FFFFFFFFFFFFF");   -- double
 end
 
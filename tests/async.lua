@@ -0,0 +1,57 @@
+#!/usr/bin/env lua
+
+local bigint, testbase = require("testbase")();
+
+local op = arg[1];
+local big1 = bigint(arg[2]);
+local big2 = bigint(arg[3]);
+local minLastProgress = tonumber(arg[4]) or 0;
+testbase.register();
+
+local opMap = {
+    ["pow"] = {bigint.Async.Pow, bigint.Pow},
+    ["/"] = {bigint.Async.Div, bigint.Div},
+    ["%"] = {bigint.Async.Mod, bigint.Mod},
+    ["tobase"] = {bigint.Async.ToBase, bigint.ToBase},
+};
+local asyncOp, syncOp = opMap[op][1], opMap[op][2];
+local other = big2;
+if op == "tobase" then
+    other = big2:ToNumber();
+end
+
+-- run in a coroutine, checking that progress is reported in order
+bigint.Async.YieldInterval = 10;
+local co = coroutine.create(function() return asyncOp(big1, other) end);
+local lastProgress = 0;
+local result;
+repeat
+    local ok, value = coroutine.resume(co);
+    if not ok then
+        error(value);
+    end
+    if coroutine.status(co) == "dead" then
+        result = value;
+    elseif type(value) ~= "number" or value < lastProgress or value > 1 then
+        error("invalid progress: " .. tostring(value));
+    else
+        lastProgress = value;
+    end
+until result ~= nil;
+if lastProgress < minLastProgress then
+    error("last progress " .. lastProgress .. " is below " .. minLastProgress);
+end
+
+-- outside of a coroutine it runs synchronously
+local syncResult = asyncOp(big1, other);
+local expected = syncOp(big1, other);
+if type(result) == "table" then
+    result = result:ToHex();
+    syncResult = syncResult:ToHex();
+    expected = expected:ToHex();
+end
+if result ~= expected or syncResult ~= expected then
+    error("async result mismatch: " .. result .. ", " .. syncResult .. " ~= " .. expected);
+end
+print(result);
+testbase.check();
@@ -0,0 +1,9 @@
+#!/usr/bin/env lua
+
+local bigint, testbase = require("testbase")();
+
+local big = bigint(arg[1]);
+testbase.register();
+local result = big:BnotS();
+print(result:ToHex())
+testbase.check();
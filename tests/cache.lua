@@ -0,0 +1,75 @@
+#!/usr/bin/env lua
+
+local bigint, testbase = require("testbase")();
+local unpack = unpack or table.unpack;
+
+-- construct each literal in turn with a cache of the given capacity
+bigint.SetCacheCapacity(tonumber(arg[1]));
+local previous = {};
+for i = 2, #arg, 1 do
+    local literal = arg[i];
+    if literal:match("^%d+$") then
+        literal = tonumber(literal);
+    end
+    local big = bigint(literal);
+    if not big:Eq(bigint.FromString(arg[i])) then
+        error("wrong value for " .. arg[i] .. ": " .. big:ToHex());
+    end
+    -- cached instances are shared
+    local stats = bigint.GetCacheStats();
+    if previous[literal] ~= nil and stats.hits > (previous.hits or 0) and not rawequal(previous[literal], big) then
+        error("cache hit returned a different instance for " .. arg[i]);
+    end
+    previous[literal] = big;
+    previous.hits = stats.hits;
+end
+local stats = bigint.GetCacheStats();
+print(stats.hits .. " " .. stats.misses .. " " .. stats.count);
+
+-- no public method may change a shared instance, even when it raises an error
+local methods = {
+    {"Unm"}, {"Abs"}, {"SetSign", -1}, {"SetSign", 0}, {"Add", 3}, {"Sub", 3}, {"Mul", 3}, {"Sqr"},
+    {"DivWithRemainder", 3}, {"Div", 3}, {"Mod", 3}, {"Pow", 3}, {"Log2"}, {"ExactLog2"},
+    {"Shr", 3}, {"Shl", 3}, {"Bor", 3}, {"Band", 3}, {"Bxor", 3}, {"Bnot"},
+    {"BandS", -3}, {"BorS", -3}, {"BxorS", -3}, {"BnotS"}, {"ShrS", 3},
+    {"SetBits", 1, 9}, {"UnsetBits", 1, 9}, {"GetBit", 1}, {"CastSigned", 1}, {"CastUnsigned", 1},
+    {"CompareU", 3}, {"Compare", 3}, {"CompareOp", 3, "<"}, {"Eq", 3}, {"Ne", 3},
+    {"Lt", 3}, {"Le", 3}, {"Gt", 3}, {"Ge", 3},
+    {"ToBytes"}, {"ToBytes", 1}, {"ToBytes", 64, true}, {"ToNumber"}, {"ToBool"},
+    {"ToHex"}, {"ToBin"}, {"ToDec"}, {"ToBase", 7}, {"WriteBase", 7, function() end},
+    {"Copy"}, {"CopyIfImmutable"}, {"IsEven"}, {"IsOne"},
+};
+for _, name in ipairs({"Pow", "Div", "Mod", "DivWithRemainder", "ToBase"}) do
+    methods[#methods + 1] = {name, 7, async = true};
+end
+for i = 2, #arg, 1 do
+    local literal = arg[i];
+    if literal:match("^%d+$") then
+        literal = tonumber(literal);
+    end
+    local expected = bigint.FromString(arg[i]);
+    for _, call in ipairs(methods) do
+        local method = bigint[call[1]];
+        if call.async then
+            method = bigint.Async[call[1]];
+        end
+        pcall(method, bigint(literal), select(2, unpack(call)));
+        if not bigint(literal):Eq(expected) then
+            error(call[1] .. " changed the cached value of " .. arg[i]);
+        end
+    end
+end
+
+-- literals with an explicit base don't share keys with other strings
+bigint.SetCacheCapacity(4);
+if not bigint("5", 10):Eq(5) or pcall(bigint, "10:5") then
+    error("10:5 was parsed from the cached entry of 5 in base 10");
+end
+
+-- large enough that unpacking all bytes at once would overflow the stack on Lua 5.1
+local large = "0x" .. ("e7"):rep(9000);
+local bytes = bigint(large):ToBytes();
+if bytes ~= ("\231"):rep(9000) or not bigint(large):Eq(bigint.FromString(large)) then
+    error("ToBytes failed on a large cached literal");
+end
+testbase.check();
@@ -0,0 +1,26 @@
+#!/usr/bin/env lua
+
+local bigint, testbase = require("testbase")();
+
+local unpack = unpack or table.unpack;
+local loadstring = loadstring or load;
+
+local expression = arg[1];
+if expression:sub(1, 1) == "{" or tonumber(expression) ~= nil then
+    -- s-expression of constants, or a single constant
+    local f = bigint.Compile(loadstring("return " .. expression:gsub("'", '"'))());
+    print(f():ToHex());
+else
+    -- infix expression of variables; evaluate twice to check that temporaries are reused safely
+    local f, params = bigint.Compile(expression);
+    local values = {};
+    local negValues = {};
+    for i = 1, #params, 1 do
+        values[i] = bigint(arg[i + 1]);
+        negValues[i] = -values[i];
+    end
+    local result1 = f(unpack(negValues));
+    local result2 = f(unpack(values));
+    print(result1:ToHex() .. " " .. result2:ToHex());
+end
+testbase.check();
@@ -0,0 +1,24 @@
+#!/usr/bin/env lua
+
+local bigint, testbase = require("testbase")();
+
+local str = arg[1];
+local base = tonumber(arg[2]);
+local chunkSize = tonumber(arg[3]);
+local position = 1;
+local function reader()
+    if position > #str then
+        return nil;
+    end
+    local chunk = str:sub(position, position + chunkSize - 1);
+    position = position + chunkSize;
+    return chunk;
+end
+local ok, big = pcall(bigint.FromReader, reader, base);
+if ok then
+    -- ToBin also shows bytes that became floats on Lua 5.3+, which ToHex formats as integers
+    print(big:ToHex() .. " " .. big:ToBin());
+else
+    print("invalid");
+end
+testbase.check();
@@ -30,7 +30,7 @@ local comparatorMap = {
 
 local unopMap = {
     ["-"] = bigint.Unm,
-    ["abs"] = bigint.Unm,
+    ["abs"] = bigint.Abs,
 };
 
 local opMapMap = {
@@ -6,7 +6,7 @@ from testutils import *
 
 unopMap = {
     "-": lambda x: -x,
-    "abs": lambda x: -x,
+    "abs": abs,
 }
 binopMap = {
     "+": lambda x, y: x + y,
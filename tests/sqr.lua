@@ -0,0 +1,13 @@
+#!/usr/bin/env lua
+
+local bigint, testbase = require("testbase")();
+
+local big = bigint(arg[1]);
+testbase.register();
+local result = big:Sqr();
+-- multiply by a copy, as Mul squares when both operands are the same instance
+if result ~= big * big:Copy() then
+    error("Sqr and Mul disagree");
+end
+print(result:ToHex())
+testbase.check();
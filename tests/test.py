@@ -121,6 +121,61 @@ def testFromStringBase(iterations):
     for n, base in zip(srandexpgen(iterations), randgen(iterations, 2, 36 + 1)):
         test(n, base)
 
+def testFromReader(iterations):
+    def test(n, base, chunkSize, strOverride=None):
+        nstr = strOverride or toBase(n, base)
+        result = runLua("fromreader.lua", nstr, str(base), str(chunkSize))
+        checkTest(hex(n) + " " + bin(n), result, nstr + " base " + str(base) + f" in chunks of {chunkSize}")
+    for chunkSize in [1, 2, 3, 7]:
+        test(0, 10, chunkSize, "")
+        test(0, 16, chunkSize, "-0x0")
+        test(-1, 10, chunkSize)
+        test(256, 2, chunkSize)
+        test(-0xdeadbeef, 16, chunkSize, "-0x00000000000deadbeef")
+        test(-0xdeadbeef, 2, chunkSize, "-0b000" + bin(0xdeadbeef)[2:])
+        test(0xdeadbeef, 10, chunkSize, "000000" + str(0xdeadbeef))
+    for n, base, chunkSize in zip(srandexpgen(iterations), randgen(iterations, 2, 36 + 1), randgen(iterations, 1, 40)):
+        test(n, base, chunkSize)
+    # signs are only valid before the digits, including in groups that evaluate to 0
+    # as are points, exponents, prefixes and the words tonumber accepts as numbers
+    for nstr, base in [("123456789012-0", 10), ("12+3", 10), ("-0xde-0", 16), ("0b1010101-0", 2), ("-1-", 7), ("12z", 10),
+                       ("1.5", 10), ("12.", 10), ("1e3", 10), ("0x1234567890", 10), ("inf", 10), ("nan", 10), ("-inf", 10),
+                       ("1.f", 16), ("0x12", 2), ("789", 7), ("1p4", 16), ("zz.z", 36)]:
+        for chunkSize in [1, 5]:
+            checkTest("invalid", runLua("fromreader.lua", nstr, str(base), str(chunkSize)), nstr + " base " + str(base))
+
+def testCache(iterations):
+    def test(capacity, literals):
+        cache = []
+        hits = 0
+        misses = 0
+        for literal in literals:
+            if capacity == 0:
+                # disabled cache keeps no stats
+                break
+            if len(literal) > 256:
+                # long strings bypass the cache
+                continue
+            if literal in cache:
+                hits += 1
+                cache.remove(literal)
+            else:
+                misses += 1
+                if len(cache) >= capacity:
+                    cache.pop(0)
+            cache.append(literal)
+        result = runLua("cache.lua", str(capacity), *literals)
+        checkTest(f"{hits} {misses} {len(cache)}", result, f"capacity {capacity}: " + ",".join(literals))
+    test(0, ["0x10", "0x10"])
+    test(1, ["0x10", "0x10", "16", "0x10"])
+    test(2, ["1", "2", "1", "3", "2", "1"])
+    test(2, ["0x" + "1" * 255, "0x" + "1" * 255, "0x" + "1" * 254, "0x" + "1" * 254])
+    for i in range(iterations):
+        # decimal literals are passed as lua numbers, so keep them exact
+        pool = [random.choice([hex(n), str(abs(n) % (2 ** 40))]) for n in srandexpgen(8)]
+        literals = [random.choice(pool) for _ in range(random.randrange(1, 20))]
+        test(random.randrange(0, 8), literals)
+
 def testFromNumber(iterations):
     def test(n):
         result = runLua("fromnumber.lua", str(n))
@@ -206,6 +261,20 @@ def testMul(iterations):
     for n1, n2 in zip(srandexpgen(iterations), srandexpgen(iterations)):
         test(n1, n2)
 
+def testSqr(iterations):
+    def test(n):
+        result = runLua("sqr.lua", hex(n))
+        checkTest(hex(n * n), result, hex(n) + " sqr")
+    test(0)
+    test(1)
+    test(-1)
+    test(-0xff)
+    test(0x100)
+    test(2 ** 1024 - 1)
+    test(-(2 ** 1024))
+    for n in srandexpgen(iterations, 64, 2048):
+        test(n)
+
 def testDiv(iterations):
     def test(n1, n2):
         result = runLua("div.lua", hex(n1), hex(n2))
@@ -276,6 +345,18 @@ def testToBase(iterations):
     for n, base in zip(srandexpgen(iterations), randgen(iterations, 2, 36 + 1)):
         test(n, base)
 
+def testWriteBase(iterations):
+    def test(n, base, chunkSize):
+        result = runLua("writebase.lua", hex(n), str(base), str(chunkSize))
+        checkTest(toBase(n, base), result, hex(n) + " base " + str(base) + f" in chunks of {chunkSize}")
+    for base in range(2, 36 + 1):
+        test(0, base, 1)
+        test(1, base, 1)
+        test(-1, base, 1)
+        test(-(2 ** 1024 - 1), base, 1)
+    for n, base, chunkSize in zip(srandexpgen(iterations, 64, 2048), randgen(iterations, 2, 36 + 1), randgen(iterations, 1, 100)):
+        test(n, base, chunkSize)
+
 def testToNumber(iterations):
     def test(n):
         result = runLua("tonumber.lua", hex(n))
@@ -371,6 +452,91 @@ def testBor(iterations):
     for n1, n2 in zip(srandexpgen(iterations), srandexpgen(iterations)):
         test(n1, n2)
 
+def testBandS(iterations):
+    def test(n1, n2):
+        result = runLua("bands.lua", hex(n1), hex(n2))
+        checkTest(hex(n1 & n2), result, hex(n1) + " & " + hex(n2))
+    test(0, 0)
+    test(1, 1)
+    test(-1, 1)
+    test(-1, -1)
+    test(1, -1)
+    test(0, -123)
+    test(-123, 0)
+    test(-0x80, -0x80)
+    test(-0x81, -0x8100)
+    test(-0x100, 0xff)
+    test(-0xdeadbeef, 0x5000)
+    test(-0xdeadbeef, -0xdeadbeef)
+    for n1, n2 in zip(srandexpgen(iterations), srandexpgen(iterations)):
+        test(n1, n2)
+
+def testBorS(iterations):
+    def test(n1, n2):
+        result = runLua("bors.lua", hex(n1), hex(n2))
+        checkTest(hex(n1 | n2), result, hex(n1) + " | " + hex(n2))
+    test(0, 0)
+    test(1, 1)
+    test(-1, 1)
+    test(-1, -1)
+    test(1, -1)
+    test(0, -123)
+    test(-123, 0)
+    test(-0x80, -0x80)
+    test(-0x81, -0x8100)
+    test(-0x100, 0xff)
+    test(-0xdeadbeef, 0x5000)
+    test(-0xdeadbeef, -0xdeadbeef)
+    for n1, n2 in zip(srandexpgen(iterations), srandexpgen(iterations)):
+        test(n1, n2)
+
+def testBxorS(iterations):
+    def test(n1, n2):
+        result = runLua("bxors.lua", hex(n1), hex(n2))
+        checkTest(hex(n1 ^ n2), result, hex(n1) + " ^ " + hex(n2))
+    test(0, 0)
+    test(1, 1)
+    test(-1, 1)
+    test(-1, -1)
+    test(1, -1)
+    test(0, -123)
+    test(-123, 0)
+    test(-0x80, -0x80)
+    test(-0x81, -0x8100)
+    test(-0x100, 0xff)
+    test(-0xdeadbeef, 0x5000)
+    test(-0xdeadbeef, -0xdeadbeef)
+    for n1, n2 in zip(srandexpgen(iterations), srandexpgen(iterations)):
+        test(n1, n2)
+
+def testBnotS(iterations):
+    def test(n):
+        result = runLua("bnots.lua", hex(n))
+        checkTest(hex(~n), result, "~" + hex(n))
+    test(0)
+    test(1)
+    test(-1)
+    test(-0x100)
+    test(0xff)
+    for n in srandexpgen(iterations):
+        test(n)
+
+def testShrS(iterations):
+    def test(n, shift):
+        result = runLua("shrs.lua", hex(n), str(shift))
+        checkTest(hex(n >> shift if shift >= 0 else n << -shift), result, hex(n) + " >> " + str(shift))
+    test(0, 1)
+    test(-1, 0)
+    test(-1, 1)
+    test(-1, 100)
+    test(-0x100, 8)
+    test(-0x100, 9)
+    test(-0x101, 8)
+    test(-0xdeadbeef, 17)
+    test(-0xdeadbeef, -17)
+    for n1, n2 in zip(srandexpgen(iterations), randgen(iterations, 65)):
+        test(n1, n2)
+
 def testShl(iterations):
     def test(n, shift):
         result = runLua("shl.lua", hex(n), str(shift))
@@ -525,19 +691,80 @@ def testRandgen(iterations):
         result = runLuaWithTimeout(10, "sexp.lua", sfmt)
         checkTest(hex(sexp.executesexp(s)), result, sfmt)
 
+def testCompile(iterations):
+    formulas = [
+        ("(a*b + c) % m", lambda a, b, c, m: (a * b + c) % m),
+        ("a * b - c", lambda a, b, c: a * b - c),
+        ("c - a * b", lambda c, a, b: c - a * b),
+        ("-(a - b) * -c % a", lambda a, b, c: -(a - b) * -c % a),
+        ("a % m * b + (c + 0x10)", lambda a, m, b, c: a % m * b + (c + 0x10)),
+        ("(a * a) ^ 3 % m", lambda a, m: (a * a) ** 3 % m),
+        ("a", lambda a: a),
+        ("(0x2a)", lambda: 0x2a),
+    ]
+    def test(expr, f, values):
+        valueStrs = [hex(n) for n in values]
+        result = runLua("compile.lua", expr, *valueStrs)
+        expected = hex(f(*[-n for n in values])) + " " + hex(f(*values))
+        checkTest(expected, result, expr + " with " + ",".join(valueStrs))
+    for expr, f in formulas:
+        argCount = f.__code__.co_argcount
+        test(expr, f, [1] * argCount)
+        for i in range(max(iterations // len(formulas), 1)):
+            test(expr, f, list(srandexpgen(argCount)))
+    # an s-expression may be a single constant
+    checkTest("0x2a", runLua("compile.lua", "42"), "42")
+    for i in range(iterations):
+        s = sexp.randgensexp(1, 10)
+        sfmt = sexp.formatsexp(s)
+        result = runLuaWithTimeout(10, "compile.lua", sfmt)
+        checkTest(hex(sexp.executesexp(s)), result, sfmt)
+
+def testAsync(iterations):
+    ops = {
+        "pow": intpow,
+        "/": intdiv,
+        "%": intmod,
+        "tobase": toBase,
+    }
+    def test(op, n1, n2, minLastProgress=0):
+        result = runLuaWithTimeout(10, "async.lua", op, hex(n1), hex(n2), str(minLastProgress))
+        expected = ops[op](n1, n2)
+        if op != "tobase":
+            expected = hex(expected)
+        checkTest(expected, result, hex(n1) + f" async {op} " + hex(n2))
+    test("pow", 0, 3)
+    test("pow", -0xdeadbeef, 5)
+    test("/", -0xdeadbeef, 0x5000)
+    test("%", -0xdeadbeef, 0x5000)
+    test("tobase", 0, 10)
+    test("tobase", -0xdeadbeef, 7)
+    # the progress estimate follows the split squaring of large operands
+    test("pow", random.getrandbits(150 * 8) | (1 << (150 * 8 - 1)), 40, 0.9)
+    for n1, n2 in zip(srandexpgen(iterations, 64, 512), srandexpgen(iterations)):
+        test(random.choice(["/", "%"]), n1, n2)
+    for n1, n2 in zip(srandexpgen(iterations), randgen(iterations, 0, 17)):
+        test("pow", n1, n2)
+    for n1, n2 in zip(srandexpgen(iterations, 64, 512), randgen(iterations, 2, 36 + 1)):
+        test("tobase", n1, n2)
+
 testsToRun = [
     testFromStringHex,
     testFromStringBin,
     testFromStringBase,
+    testFromReader,
+    testCache,
     testFromNumber,
     testFromArray,
     testFromBytes,
     testToBase,
+    testWriteBase,
     testToNumber,
     testToBytes,
     testAdd,
     testSub,
     testMul,
+    testSqr,
     testDiv,
     testMod,
     testPow,
@@ -547,6 +774,11 @@ testsToRun = [
     testBor,
     testShl,
     testShr,
+    testBandS,
+    testBorS,
+    testBxorS,
+    testBnotS,
+    testShrS,
     testCompare,
     testSetBits,
     testUnsetBits,
@@ -554,6 +786,8 @@ testsToRun = [
     testCastSigned,
     testCastUnsigned,
     testRandgen,
+    testCompile,
+    testAsync,
 ]
 
 iterations = 1000
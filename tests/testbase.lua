@@ -140,6 +140,18 @@ end
 package.path = "../?.lua;" .. package.path;
 origEnv = testbase.getEnv();
 
+-- Lua 5.1 and LuaJIT parse numbers with a base using C strtoul, which saturates
+-- where unsigned long is 32 bits, so the library sees a tonumber that treats larger
+-- results as errors on every build
+local rawTonumber = tonumber;
+tonumber = function(value, base)
+    local result = rawTonumber(value, base);
+    if base ~= nil and result ~= nil and result > 0xffffffff then
+        error("tonumber result exceeds 32 bits: " .. value);
+    end
+    return result;
+end
 bigint = require(importPath);
+tonumber = rawTonumber;
 return function() return bigint, testbase end
 
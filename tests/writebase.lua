@@ -0,0 +1,20 @@
+#!/usr/bin/env lua
+
+local bigint, testbase = require("testbase")();
+
+local big = bigint(arg[1]);
+local base = tonumber(arg[2]);
+local chunkSize = tonumber(arg[3]);
+testbase.register();
+local chunks = {};
+big:WriteBase(base, function(chunk) chunks[#chunks + 1] = chunk end, chunkSize);
+-- chunks end on a digit group, so each has at least chunkSize digits unless it is the first or last,
+-- and less than chunkSize plus the largest group size, 25 digits in base 3 on double builds
+for i, chunk in ipairs(chunks) do
+    local digits = #chunk:gsub("^%-", "");
+    if digits == 0 or digits >= chunkSize + 25 or (i > 1 and i < #chunks and digits < chunkSize) then
+        error("chunk " .. i .. " of " .. #chunks .. " has " .. digits .. " digits for chunk size " .. chunkSize);
+    end
+end
+print(table.concat(chunks));
+testbase.check();